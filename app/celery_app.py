@@ -20,4 +20,6 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=100,
+    # Previews go to their own queue so they never wait behind bulk conversions
+    task_routes={"app.tasks.generate_preview": {"queue": "preview"}},
 )
\ No newline at end of file
@@ -1,7 +1,12 @@
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, Form, Query, UploadFile, Depends, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
-from typing import List
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+from typing import List, Optional
+from urllib.parse import quote
+from pathlib import Path
 import uuid
 import os
 import shutil
@@ -10,16 +15,31 @@ from datetime import datetime
 from app.database import get_db, engine
 from app.models import Base, Job, File as FileModel, JobStatus
 from app.schemas import JobCreateResponse, JobStatusResponse, FileStatusResponse
-from app.utils import ensure_directories, get_job_temp_dir, extract_docx_files
-from app.tasks import process_job
+from app.utils import (
+    ensure_directories, get_job_temp_dir, get_preview_path,
+    acquire_preview_lock, extract_docx_files, parse_page_range
+)
+from app.tasks import process_job, generate_preview
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PREVIEW_DEFAULT_PAGES = int(os.getenv("PREVIEW_PAGES", "1"))
+PREVIEW_MAX_PAGES = int(os.getenv("PREVIEW_MAX_PAGES", "10"))
+PREVIEW_TIMEOUT = float(os.getenv("PREVIEW_TIMEOUT", "30"))
+PREVIEW_LOCK_TTL = float(os.getenv("PREVIEW_LOCK_TTL", "300"))
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+# create_all never alters existing tables, so add columns introduced later.
+# IF NOT EXISTS keeps this safe when several API processes start together.
+if "page_range" not in {c["name"] for c in inspect(engine).get_columns("jobs")}:
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS page_range VARCHAR"))
+    logger.info("Added jobs.page_range column")
+
 app = FastAPI(
     title="DOCX to PDF Conversion Service",
     description="Asynchronous bulk document conversion service",
@@ -47,6 +67,7 @@ async def health_check():
 @app.post("/api/v1/jobs", response_model=JobCreateResponse, status_code=202)
 async def create_job(
     file: UploadFile = File(..., description="Zip file containing DOCX files"),
+    pages: Optional[str] = Form(None, description="Page range to convert, e.g. \"1-3\", \"2\" or \"5-\""),
     db: Session = Depends(get_db)
 ):
   
@@ -54,6 +75,13 @@ async def create_job(
     if not file.filename.endswith('.zip'):
         raise HTTPException(status_code=400, detail="File must be a zip archive")
     
+    # Validate page range
+    try:
+        parse_page_range(pages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page_range = pages.strip() if pages and pages.strip() else None
+    
     # Generate unique job ID
     job_id = str(uuid.uuid4())
     
@@ -82,7 +110,8 @@ async def create_job(
         job = Job(
             id=job_id,
             status=JobStatus.PENDING,
-            file_count=len(docx_files)
+            file_count=len(docx_files),
+            page_range=page_range
         )
         db.add(job)
         
@@ -98,7 +127,7 @@ async def create_job(
         logger.info(f"Created job {job_id} with {len(docx_files)} files")
         
         # Enqueue job for processing (asynchronous)
-        process_job.delay(job_id, docx_files)
+        process_job.delay(job_id, docx_files, page_range)
         
         return JobCreateResponse(
             job_id=job_id,
@@ -126,11 +155,13 @@ async def get_job_status(job_id: str, db: Session = Depends(get_db)):
         job_id=job.id,
         status=job.status,
         created_at=job.created_at,
+        page_range=job.page_range,
         files=[
             FileStatusResponse(
                 filename=f.filename,
                 status=f.status,
-                error_message=f.error_message
+                error_message=f.error_message,
+                preview_url=f"/api/v1/jobs/{job_id}/files/{quote(f.filename)}/preview"
             )
             for f in job.files
         ]
@@ -168,6 +199,60 @@ async def download_results(job_id: str, db: Session = Depends(get_db)):
         filename=f"converted_{job_id}.zip"
     )
 
+def _wait_for_preview(job_id: str, filename: str, pages: int, preview_path: str):
+    """Enqueue a preview render unless one is in flight, then wait for it.
+
+    Retries while a render is in flight wait on the same task instead of
+    queueing another one. Runs in a worker thread; the result backend is
+    not thread safe, so the AsyncResult is created and waited on here.
+    """
+    task_id = f"preview:{job_id}:{filename}:{pages}"
+    result = generate_preview.AsyncResult(task_id)
+    lock_token = acquire_preview_lock(preview_path, PREVIEW_LOCK_TTL)
+    if lock_token:
+        # Drop any stored result of an earlier failed render
+        result.forget()
+        generate_preview.apply_async((job_id, filename, pages, lock_token), task_id=task_id)
+    return result.get(timeout=PREVIEW_TIMEOUT)
+
+@app.get("/api/v1/jobs/{job_id}/files/{filename}/preview")
+async def preview_file(
+    job_id: str,
+    filename: str,
+    pages: int = Query(PREVIEW_DEFAULT_PAGES, ge=1, le=PREVIEW_MAX_PAGES),
+    db: Session = Depends(get_db)
+):
+    
+    
+    file_record = db.query(FileModel).filter(
+        FileModel.job_id == job_id,
+        FileModel.filename == filename
+    ).first()
+    
+    if not file_record:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    preview_path = get_preview_path(job_id, filename, pages)
+    
+    # Render on the dedicated preview queue unless already cached
+    if not os.path.exists(preview_path):
+        try:
+            await run_in_threadpool(_wait_for_preview, job_id, filename, pages, preview_path)
+        except CeleryTimeoutError:
+            return JSONResponse(
+                status_code=202,
+                content={"detail": "Preview is being generated, retry shortly"}
+            )
+        except Exception as e:
+            logger.error(f"Error generating preview for {filename} in job {job_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
+    
+    return FileResponse(
+        preview_path,
+        media_type="application/pdf",
+        filename=f"{Path(filename).stem}_preview.pdf"
+    )
+
 @app.delete("/api/v1/jobs/{job_id}")
 async def delete_job(job_id: str, db: Session = Depends(get_db)):
    
@@ -26,6 +26,7 @@ class Job(Base):
     file_count = Column(Integer)
     completed_count = Column(Integer, default=0)
     failed_count = Column(Integer, default=0)
+    page_range = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -7,6 +7,7 @@ class FileStatusResponse(BaseModel):
     filename: str
     status: FileStatus
     error_message: Optional[str] = None
+    preview_url: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -19,6 +20,7 @@ class JobStatusResponse(BaseModel):
     job_id: str
     status: JobStatus
     created_at: datetime
+    page_range: Optional[str] = None
     download_url: Optional[str] = None
     files: List[FileStatusResponse]
     
@@ -2,22 +2,124 @@ from celery import chord
 from app.celery_app import celery_app
 from app.database import get_db_context
 from app.models import Job, File, JobStatus, FileStatus
-from app.utils import get_job_temp_dir, get_job_output_dir, create_result_zip
+from app.utils import (
+    get_job_temp_dir, get_job_output_dir, get_preview_path,
+    release_preview_lock, create_result_zip, parse_page_range
+)
 import os
 import logging
 from pathlib import Path
+from typing import Optional
 
 # Pure Python conversion
 from docx import Document
+from docx.text.paragraph import Paragraph as DocxParagraph
 from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class PageRangeDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that stops laying out once `last_page` has been emitted.
+
+    The remaining story is dropped as soon as the last wanted page ends, so
+    reportlab never lays out (or draws) pages that would be thrown away.
+    """
+    
+    def __init__(self, filename, last_page: Optional[int] = None, **kw):
+        super().__init__(filename, **kw)
+        self.last_page = last_page
+        self._story = None
+    
+    def build(self, flowables, **kw):
+        self._story = flowables
+        super().build(flowables, **kw)
+    
+    def handle_pageEnd(self):
+        super().handle_pageEnd()
+        if self.last_page is not None and self.page >= self.last_page and self._story:
+            # Emptying the story ends the build loop; the hanging page
+            # begin is discarded by _endBuild so no blank page is added.
+            del self._story[:]
+
+
+def _page_range_canvas(first_page: int):
+    """Canvas class that discards pages before `first_page` instead of writing them"""
+    
+    class PageRangeCanvas(Canvas):
+        def showPage(self):
+            if self.getPageNumber() < first_page:
+                # Drop this page's drawing operations and move on. Canvas has no
+                # public way to discard a page, so this mirrors the tail of
+                # Canvas.showPage (reportlab 4.0.x) minus _doc.addPage and the
+                # _onPage hook; tests/test_tasks.py guards it on upgrades.
+                self._startPage()
+                return
+            super().showPage()
+    
+    return PageRangeCanvas
+
+
+def render_docx_to_pdf(input_path: str, output_path: str,
+                       first_page: int = 1, last_page: Optional[int] = None):
+    """Render a DOCX file to PDF, optionally keeping only pages first_page..last_page.
+
+    The PDF is written to a temporary name and moved into place only on
+    success, so a failed render never leaves a PDF behind in output_path.
+    Raises ValueError if a range starting after page 1 begins past the end
+    of the document.
+    """
+    doc = Document(input_path)
+    
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    pdf = PageRangeDocTemplate(tmp_path, last_page=last_page, pagesize=letter)
+    styles = getSampleStyleSheet()
+    style = styles['Normal']
+    
+    # Every non-empty paragraph takes at least one line, so no more than
+    # this many can land on the wanted pages; stop reading the DOCX there.
+    max_paragraphs = None
+    if last_page is not None:
+        max_paragraphs = last_page * int(pdf.height // style.leading + 1)
+    
+    story = []
+    paragraph_count = 0
+    
+    # Convert paragraphs
+    for block in doc.iter_inner_content():
+        if not isinstance(block, DocxParagraph) or not block.text.strip():
+            continue
+        if max_paragraphs is not None and paragraph_count >= max_paragraphs:
+            break
+        story.append(Paragraph(block.text, style))
+        story.append(Spacer(1, 12))
+        paragraph_count += 1
+    
+    try:
+        # Build PDF
+        if first_page > 1:
+            pdf.build(story, canvasmaker=_page_range_canvas(first_page))
+        else:
+            pdf.build(story)
+        
+        # Documents without text still convert to a blank PDF; only an
+        # explicit range that starts past the last page has nothing to keep.
+        if first_page > 1 and pdf.page < first_page:
+            # An empty story still renders as a single blank page
+            page_count = max(pdf.page, 1)
+            raise ValueError(f"Page range starts at page {first_page} but document has {page_count} pages")
+        
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 @celery_app.task(bind=True, max_retries=3)
-def convert_docx_to_pdf(self, job_id: str, filename: str):
+def convert_docx_to_pdf(self, job_id: str, filename: str, page_range: Optional[str] = None):
     
     logger.info(f"Starting conversion for {filename} in job {job_id}")
     
@@ -45,23 +147,8 @@ def convert_docx_to_pdf(self, job_id: str, filename: str):
             if not os.path.exists(input_path):
                 raise FileNotFoundError(f"Input file not found: {input_path}")
             
-            # Read DOCX
-            doc = Document(input_path)
-            
-            # Create PDF
-            pdf = SimpleDocTemplate(output_path, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Convert paragraphs
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    p = Paragraph(para.text, styles['Normal'])
-                    story.append(p)
-                    story.append(Spacer(1, 12))
-            
-            # Build PDF
-            pdf.build(story)
+            first_page, last_page = parse_page_range(page_range)
+            render_docx_to_pdf(input_path, output_path, first_page, last_page)
             
             # Verify output
             if not os.path.exists(output_path):
@@ -84,6 +171,30 @@ def convert_docx_to_pdf(self, job_id: str, filename: str):
             
             return {"status": "failed", "filename": filename, "error": str(e)}
 
+@celery_app.task
+def generate_preview(job_id: str, filename: str, pages: int, lock_token: Optional[str] = None):
+    """Render the first `pages` pages of a file into the preview cache"""
+    
+    logger.info(f"Generating {pages}-page preview for {filename} in job {job_id}")
+    
+    input_path = os.path.join(get_job_temp_dir(job_id), filename)
+    preview_path = get_preview_path(job_id, filename, pages)
+    
+    try:
+        if os.path.exists(preview_path):
+            return preview_path
+        
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        render_docx_to_pdf(input_path, preview_path, last_page=pages)
+    finally:
+        if lock_token:
+            release_preview_lock(preview_path, lock_token)
+    
+    logger.info(f"Preview ready: {preview_path}")
+    return preview_path
+
 @celery_app.task
 def finalize_job(results, job_id: str):  # FIXED: Added 'results' parameter
   
@@ -130,7 +241,7 @@ def finalize_job(results, job_id: str):  # FIXED: Added 'results' parameter
             db.commit()
 
 @celery_app.task
-def process_job(job_id: str, filenames: list):
+def process_job(job_id: str, filenames: list, page_range: Optional[str] = None):
     
     logger.info(f"Processing job {job_id} with {len(filenames)} files")
     
@@ -140,5 +251,5 @@ def process_job(job_id: str, filenames: list):
             job.status = JobStatus.IN_PROGRESS
             db.commit()
     
-    conversion_tasks = [convert_docx_to_pdf.s(job_id, filename) for filename in filenames]
+    conversion_tasks = [convert_docx_to_pdf.s(job_id, filename, page_range) for filename in filenames]
     chord(conversion_tasks)(finalize_job.s(job_id))
\ No newline at end of file
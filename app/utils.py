@@ -2,17 +2,20 @@ import os
 import zipfile
 import uuid
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 import shutil
+import time
 
 STORAGE_PATH = os.getenv("STORAGE_PATH", "/app/storage")
 TEMP_PATH = os.path.join(STORAGE_PATH, "temp")
 OUTPUT_PATH = os.path.join(STORAGE_PATH, "output")
+PREVIEW_PATH = os.path.join(STORAGE_PATH, "preview")
 
 def ensure_directories():
     """Create necessary directories if they don't exist"""
     Path(TEMP_PATH).mkdir(parents=True, exist_ok=True)
     Path(OUTPUT_PATH).mkdir(parents=True, exist_ok=True)
+    Path(PREVIEW_PATH).mkdir(parents=True, exist_ok=True)
 
 def get_job_temp_dir(job_id: str) -> str:
     """Get temporary directory for a job"""
@@ -26,6 +29,76 @@ def get_job_output_dir(job_id: str) -> str:
     Path(path).mkdir(parents=True, exist_ok=True)
     return path
 
+def get_job_preview_dir(job_id: str) -> str:
+    """Get preview directory for a job (kept apart from output so previews never end up in the result zip)"""
+    path = os.path.join(PREVIEW_PATH, job_id)
+    Path(path).mkdir(parents=True, exist_ok=True)
+    return path
+
+def get_preview_path(job_id: str, filename: str, pages: int) -> str:
+    """Get cached preview PDF path for the first `pages` pages of a file"""
+    return os.path.join(get_job_preview_dir(job_id), f"{Path(filename).stem}.first{pages}.pdf")
+
+def acquire_preview_lock(preview_path: str, ttl: float) -> Optional[str]:
+    """Claim the render of a preview.
+
+    Returns an owner token to hand to release_preview_lock, or None if
+    another render is already in flight. A lock older than ttl seconds is
+    treated as stale (e.g. the worker died) and taken over.
+    """
+    lock_path = f"{preview_path}.lock"
+    try:
+        if time.time() - os.path.getmtime(lock_path) > ttl:
+            os.remove(lock_path)
+    except FileNotFoundError:
+        pass
+    
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    
+    token = str(uuid.uuid4())
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    return token
+
+def release_preview_lock(preview_path: str, token: str):
+    """Release a preview lock, but only if it is still held by token"""
+    lock_path = f"{preview_path}.lock"
+    try:
+        with open(lock_path) as f:
+            if f.read() != token:
+                # Taken over after going stale; the new holder releases it
+                return
+        os.remove(lock_path)
+    except FileNotFoundError:
+        pass
+
+def parse_page_range(value: Optional[str]) -> Tuple[int, Optional[int]]:
+    """Parse a page range such as "3", "2-5" or "4-" into (first, last).
+
+    Pages are 1-based and inclusive; last is None for an open-ended range.
+    Raises ValueError for malformed or empty ranges.
+    """
+    if value is None or not value.strip():
+        return 1, None
+    
+    start, sep, end = value.strip().partition('-')
+    try:
+        first = int(start) if start.strip() else 1
+        if not sep:
+            last = first
+        else:
+            last = int(end) if end.strip() else None
+    except ValueError:
+        raise ValueError(f"Invalid page range: {value!r}")
+    
+    if first < 1 or (last is not None and last < first):
+        raise ValueError(f"Invalid page range: {value!r}")
+    
+    return first, last
+
 def extract_docx_files(zip_path: str, destination: str) -> List[str]:
     """Extract DOCX files from uploaded zip"""
     docx_files = []
@@ -68,9 +141,13 @@ def cleanup_job_files(job_id: str):
     """Clean up temporary and output files for a job"""
     temp_dir = get_job_temp_dir(job_id)
     output_dir = get_job_output_dir(job_id)
+    preview_dir = get_job_preview_dir(job_id)
     
     if os.path.exists(temp_dir):
         shutil.rmtree(temp_dir)
     
     if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
\ No newline at end of file
+        shutil.rmtree(output_dir)
+    
+    if os.path.exists(preview_dir):
+        shutil.rmtree(preview_dir)
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Shared test setup: point the app at a throwaway database and storage
+directory before any app module is imported.
+"""
+import os
+import tempfile
+
+_TEST_ROOT = tempfile.mkdtemp(prefix="docx_converter_tests_")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_ROOT, 'test.db')}"
+os.environ["STORAGE_PATH"] = os.path.join(_TEST_ROOT, "storage")
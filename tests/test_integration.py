@@ -58,6 +58,21 @@ def test_full_workflow():
     print(f"   ✓ Job created: {job_id}")
     print(f"   ✓ File count: {job_data['file_count']}")
     
+    # Step 1b: Preview the first page before the job finishes
+    print("\n   Requesting first-page preview...")
+    preview_url = f"{BASE_URL}/jobs/{job_id}/files/document_1.docx/preview?pages=1"
+    for _ in range(12):
+        response = requests.get(preview_url)
+        assert response.status_code in (200, 202), f"Preview failed: {response.text}"
+        if response.status_code == 200:
+            break
+        time.sleep(5)
+    
+    assert response.status_code == 200, "Preview was not ready in time"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    print(f"   ✓ Preview: {len(response.content)} bytes")
+    
     # Step 2: Poll for completion
     print("\n2. Waiting for conversion to complete...")
     max_attempts = 60  # 5 minutes maximum
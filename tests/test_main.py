@@ -0,0 +1,94 @@
+"""
+Unit tests for the preview endpoint, with the Celery task mocked out
+"""
+import uuid
+from unittest import mock
+
+import pytest
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+from fastapi.testclient import TestClient
+
+from app import main
+from app.database import SessionLocal
+from app.models import Job, File as FileModel, JobStatus
+from app.utils import acquire_preview_lock, get_preview_path
+
+FILENAME = "doc.docx"
+PDF_BYTES = b"%PDF-1.4 preview"
+
+client = TestClient(main.app)
+
+@pytest.fixture
+def job_id():
+    """Create a job with a single file record"""
+    job_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        db.add(Job(id=job_id, status=JobStatus.IN_PROGRESS, file_count=1))
+        db.add(FileModel(job_id=job_id, filename=FILENAME))
+        db.commit()
+    return job_id
+
+@pytest.fixture
+def preview_task(monkeypatch):
+    task = mock.MagicMock()
+    monkeypatch.setattr(main, "generate_preview", task)
+    return task
+
+def preview_url(job_id: str) -> str:
+    return f"/api/v1/jobs/{job_id}/files/{FILENAME}/preview?pages=1"
+
+def write_preview(job_id: str):
+    with open(get_preview_path(job_id, FILENAME, 1), "wb") as f:
+        f.write(PDF_BYTES)
+
+def test_preview_cache_hit(job_id, preview_task):
+    write_preview(job_id)
+    
+    response = client.get(preview_url(job_id))
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content == PDF_BYTES
+    preview_task.apply_async.assert_not_called()
+
+def test_preview_miss_enqueues_once(job_id, preview_task):
+    preview_task.AsyncResult.return_value.get.side_effect = lambda timeout: write_preview(job_id)
+    
+    response = client.get(preview_url(job_id))
+    
+    assert response.status_code == 200
+    assert response.content == PDF_BYTES
+    preview_task.apply_async.assert_called_once()
+    args, kwargs = preview_task.apply_async.call_args
+    assert args[0][:3] == (job_id, FILENAME, 1)
+    assert kwargs["task_id"] == f"preview:{job_id}:{FILENAME}:1"
+
+def test_preview_in_flight_does_not_enqueue(job_id, preview_task):
+    acquire_preview_lock(get_preview_path(job_id, FILENAME, 1), main.PREVIEW_LOCK_TTL)
+    preview_task.AsyncResult.return_value.get.side_effect = CeleryTimeoutError()
+    
+    response = client.get(preview_url(job_id))
+    
+    assert response.status_code == 202
+    preview_task.apply_async.assert_not_called()
+    preview_task.AsyncResult.assert_called_once_with(f"preview:{job_id}:{FILENAME}:1")
+
+def test_preview_timeout_returns_202(job_id, preview_task):
+    preview_task.AsyncResult.return_value.get.side_effect = CeleryTimeoutError()
+    
+    response = client.get(preview_url(job_id))
+    
+    assert response.status_code == 202
+    preview_task.apply_async.assert_called_once()
+    
+    # A retry while the first render is still running waits on it instead
+    response = client.get(preview_url(job_id))
+    
+    assert response.status_code == 202
+    preview_task.apply_async.assert_called_once()
+
+def test_preview_unknown_file(job_id, preview_task):
+    response = client.get(f"/api/v1/jobs/{job_id}/files/missing.docx/preview")
+    
+    assert response.status_code == 404
+    preview_task.apply_async.assert_not_called()
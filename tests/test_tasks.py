@@ -0,0 +1,105 @@
+"""
+Unit tests for DOCX to PDF rendering
+"""
+import base64
+import re
+import zlib
+
+import pytest
+from docx import Document
+
+from app.tasks import render_docx_to_pdf
+
+PARAGRAPH_COUNT = 400
+
+def create_docx(path, paragraphs):
+    """Create a DOCX file with one paragraph per string"""
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    doc.save(path)
+    return str(path)
+
+def pdf_page_count(path) -> int:
+    """Count page objects in a PDF written by reportlab"""
+    with open(path, 'rb') as f:
+        return len(re.findall(rb'/Type /Page\b(?!s)', f.read()))
+
+def pdf_page_texts(path) -> list:
+    """Decoded content stream of each page, in order (ASCII85 + Flate)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    streams = re.findall(rb'stream\r?\n(.*?)endstream', data, re.S)
+    texts = []
+    for stream in streams:
+        try:
+            texts.append(zlib.decompress(base64.a85decode(stream.strip(), adobe=True)))
+        except (ValueError, zlib.error):
+            continue
+    return [t for t in texts if b'BT' in t]
+
+@pytest.fixture
+def long_docx(tmp_path):
+    return create_docx(
+        tmp_path / "long.docx",
+        [f"Paragraph {i}" for i in range(PARAGRAPH_COUNT)]
+    )
+
+@pytest.fixture
+def full_page_count(long_docx, tmp_path):
+    output_path = str(tmp_path / "full.pdf")
+    render_docx_to_pdf(long_docx, output_path)
+    return pdf_page_count(output_path)
+
+@pytest.mark.parametrize("first_page, last_page, expected", [
+    (1, 1, 1),
+    (2, 3, 2),
+    (1, 2, 2),
+])
+def test_render_page_range(long_docx, tmp_path, first_page, last_page, expected):
+    output_path = str(tmp_path / "out.pdf")
+    render_docx_to_pdf(long_docx, output_path, first_page, last_page)
+    assert pdf_page_count(output_path) == expected
+
+def test_render_open_ended_range(long_docx, full_page_count, tmp_path):
+    output_path = str(tmp_path / "out.pdf")
+    render_docx_to_pdf(long_docx, output_path, first_page=full_page_count)
+    assert pdf_page_count(output_path) == 1
+
+def test_render_range_past_end_leaves_no_output(long_docx, full_page_count, tmp_path):
+    output_path = tmp_path / "out.pdf"
+    with pytest.raises(ValueError):
+        render_docx_to_pdf(long_docx, str(output_path), first_page=full_page_count + 1)
+    assert not output_path.exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+@pytest.mark.parametrize("last_page", [None, 1])
+def test_render_empty_document(tmp_path, last_page):
+    """Documents without text still convert, as a full render or a preview"""
+    docx_path = create_docx(tmp_path / "empty.docx", [])
+    output_path = tmp_path / "empty.pdf"
+    render_docx_to_pdf(docx_path, str(output_path), last_page=last_page)
+    assert output_path.read_bytes().startswith(b'%PDF')
+
+def test_render_empty_document_range_past_end(tmp_path):
+    docx_path = create_docx(tmp_path / "empty.docx", [])
+    with pytest.raises(ValueError, match="document has 1 pages"):
+        render_docx_to_pdf(docx_path, str(tmp_path / "empty.pdf"), first_page=2)
+
+def test_leading_pages_are_dropped(long_docx, tmp_path):
+    """Pages before the start of a range are discarded and the rest kept"""
+    docx_path = long_docx
+    full_path = str(tmp_path / "full.pdf")
+    ranged_path = str(tmp_path / "ranged.pdf")
+    
+    render_docx_to_pdf(docx_path, full_path)
+    render_docx_to_pdf(docx_path, ranged_path, first_page=2)
+    
+    full_pages = pdf_page_texts(full_path)
+    ranged_pages = pdf_page_texts(ranged_path)
+    
+    assert len(full_pages) > 2
+    assert pdf_page_count(ranged_path) == pdf_page_count(full_path) - 1
+    assert ranged_pages == full_pages[1:]
+    assert b'Paragraph 0)' not in b''.join(ranged_pages)
+    assert f'Paragraph {PARAGRAPH_COUNT - 1})'.encode() in ranged_pages[-1]
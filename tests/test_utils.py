@@ -0,0 +1,56 @@
+"""
+Unit tests for helper functions
+"""
+import os
+
+import pytest
+
+from app.utils import acquire_preview_lock, release_preview_lock, parse_page_range
+
+@pytest.mark.parametrize("value, expected", [
+    (None, (1, None)),
+    ("", (1, None)),
+    ("2", (2, 2)),
+    ("1-3", (1, 3)),
+    ("5-", (5, None)),
+    ("-", (1, None)),
+    ("-3", (1, 3)),
+    (" 2 - 4 ", (2, 4)),
+])
+def test_parse_page_range(value, expected):
+    assert parse_page_range(value) == expected
+
+@pytest.mark.parametrize("value", ["0", "0-2", "3-1", "1-2-3", "a", "1-b"])
+def test_parse_page_range_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_page_range(value)
+
+def test_preview_lock_is_exclusive(tmp_path):
+    preview_path = str(tmp_path / "doc.first1.pdf")
+    
+    assert acquire_preview_lock(preview_path, ttl=60)
+    assert acquire_preview_lock(preview_path, ttl=60) is None
+
+def test_stale_preview_lock_is_taken_over(tmp_path):
+    preview_path = str(tmp_path / "doc.first1.pdf")
+    old_token = acquire_preview_lock(preview_path, ttl=60)
+    os.utime(f"{preview_path}.lock", (0, 0))
+    
+    new_token = acquire_preview_lock(preview_path, ttl=60)
+    
+    assert new_token and new_token != old_token
+    # The stale holder finishing late must not release the new holder's lock
+    release_preview_lock(preview_path, old_token)
+    assert acquire_preview_lock(preview_path, ttl=60) is None
+    
+    release_preview_lock(preview_path, new_token)
+    assert acquire_preview_lock(preview_path, ttl=60)
+
+def test_release_preview_lock_is_idempotent(tmp_path):
+    preview_path = str(tmp_path / "doc.first1.pdf")
+    token = acquire_preview_lock(preview_path, ttl=60)
+    
+    release_preview_lock(preview_path, token)
+    release_preview_lock(preview_path, token)
+    
+    assert not os.path.exists(f"{preview_path}.lock")